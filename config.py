@@ -0,0 +1,44 @@
+"""Static GUI configuration: formats, theme palettes, prebuilt stylesheets."""
+
+FORMAT_FILTER_MAP = {
+    "mp3": "MP3 Files (*.mp3)",
+    "opus": "Opus Files (*.opus)",
+    "aac": "AAC Files (*.aac)",
+    "flac": "FLAC Files (*.flac)",
+}
+
+FORMAT_EXTENSION_MAP = {
+    "mp3": ".mp3",
+    "opus": ".opus",
+    "aac": ".aac",
+    "flac": ".flac",
+}
+
+DARK_THEME = {
+    "window_bg": "#2E2E2E",
+    "window_fg": "#FFFFFF",
+    "edit_bg": "#3E3E3E",
+    "edit_fg": "#FFFFFF",
+}
+
+LIGHT_THEME = {
+    "window_bg": "#FFFFFF",
+    "window_fg": "#000000",
+    "edit_bg": "#F0F0F0",
+    "edit_fg": "#000000",
+}
+
+
+def build_stylesheet(theme):
+    return (
+        f"QWidget {{ background-color: {theme['window_bg']}; "
+        f"color: {theme['window_fg']}; }}\n"
+        f"QTextEdit {{ background-color: {theme['edit_bg']}; "
+        f"color: {theme['edit_fg']}; }}"
+    )
+
+
+# The palettes are constants, so the QSS is too: build both once at import
+# and hand theme switches a ready-made string.
+DARK_STYLESHEET = build_stylesheet(DARK_THEME)
+LIGHT_STYLESHEET = build_stylesheet(LIGHT_THEME)
@@ -1,3 +1,5 @@
+import os
+
 from PyQt6.QtWidgets import (
     QWidget,
     QVBoxLayout,
@@ -5,9 +7,11 @@ from PyQt6.QtWidgets import (
     QTextEdit,
     QLabel,
     QLineEdit,
+    QListWidget,
     QPushButton,
     QProgressBar,
     QCheckBox,
+    QDialog,
     QFileDialog,
     QComboBox,
     QFrame,
@@ -16,28 +20,149 @@ from PyQt6.QtWidgets import (
     QMenu,
     QInputDialog,
 )
-from PyQt6.QtCore import Qt, pyqtSignal, pyqtSlot
-from PyQt6.QtGui import QIcon, QAction
+from PyQt6.QtCore import QLocale, Qt, QSignalBlocker, QTimer, pyqtSignal, pyqtSlot
+from PyQt6.QtGui import QIcon, QAction, QDoubleValidator, QValidator
+from threading import Thread
+
+import config
 from tts import create_tts
-from utils import split_text, estimate_price, read_api_key, save_api_key
+from utils import (
+    split_text,
+    estimate_price,
+    load_presets,
+    prewarm_connection,
+    read_api_key,
+    save_api_key,
+    save_presets,
+)
+
+
+# Built once at import; show_message picks an icon with one dict lookup
+# instead of an if/elif ladder per call.
+_MSG_ICONS = {
+    "info": QMessageBox.Icon.Information,
+    "warning": QMessageBox.Icon.Warning,
+    "critical": QMessageBox.Icon.Critical,
+}
+
+# Enum combinations resolved once at import; the close path reads plain
+# module globals instead of chasing nested attribute lookups.
+_YES = QMessageBox.StandardButton.Yes
+_NO = QMessageBox.StandardButton.No
+_YES_NO = _YES | _NO
+
+
+class PresetDialog(QDialog):
+    preset_selected = pyqtSignal(dict)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Presets")
+        self._presets = {}
+
+        layout = QVBoxLayout()
+        self.preset_list = QListWidget(self)
+        layout.addWidget(self.preset_list)
+
+        button_layout = QHBoxLayout()
+        self.save_button = QPushButton("Save Current", self)
+        self.load_button = QPushButton("Load", self)
+        self.delete_button = QPushButton("Delete", self)
+        button_layout.addWidget(self.save_button)
+        button_layout.addWidget(self.load_button)
+        button_layout.addWidget(self.delete_button)
+        layout.addLayout(button_layout)
+        self.setLayout(layout)
+
+        self.save_button.clicked.connect(self.save_current)
+        self.load_button.clicked.connect(self.load_selected)
+        self.delete_button.clicked.connect(self.delete_selected)
+        self.preset_list.itemDoubleClicked.connect(lambda _: self.load_selected())
+
+        self.load_presets()
+
+    def load_presets(self):
+        self._presets = load_presets()
+        # One batch insert with notifications suppressed instead of a
+        # per-item round trip into the model and its signals.
+        with QSignalBlocker(self.preset_list):
+            self.preset_list.clear()
+            self.preset_list.addItems(sorted(self._presets, key=str.lower))
+
+    def save_current(self):
+        name, ok = QInputDialog.getText(self, "Save Preset", "Preset name:")
+        name = name.strip()
+        if not (ok and name):
+            return
+        self._presets[name] = self.parent().current_settings()
+        save_presets(self._presets)
+        self.load_presets()
+
+    def load_selected(self):
+        item = self.preset_list.currentItem()
+        if item:
+            self.preset_selected.emit(self._presets[item.text()])
+            self.accept()
+
+    def delete_selected(self):
+        item = self.preset_list.currentItem()
+        if item:
+            self._presets.pop(item.text(), None)
+            save_presets(self._presets)
+            self.load_presets()
 
 
 class TTSWindow(QWidget):
     progress_updated = pyqtSignal(int)
+    status_updated = pyqtSignal(str)
+    api_key_loaded = pyqtSignal(str)
+    ui_enabled = pyqtSignal(bool)
+
+    # Delay before re-chunking the text after the user stops typing (ms).
+    COUNT_DEBOUNCE_MS = 200
 
     def __init__(self):
         super().__init__()
-        self.api_key = read_api_key()
+        self.api_key = None
+        # Last debounced split, reused by create_tts when the text hasn't
+        # changed since.
+        self._cached_chunks = None
+        self._cached_chunks_text = None
+        self._preset_dialog = None
+        # toPlainText rebuilds the whole string from the document on every
+        # call; cache it per edit so the count, split and submit paths all
+        # share one copy.
+        self._text_cache = ""
+        self._text_dirty = False
+        self._running = False
+        self._force_close = False
+        self._msgbox_prewarmed = False
+        self._msg_cache = {}
+        # Set by tts.create_tts for the duration of a job.
+        self.job_cancel_event = None
         self.initUI()
+        self.setStyleSheet(config.DARK_STYLESHEET)  # Dark theme by default
+        # Key-file I/O and the TLS pre-warm share one background thread so
+        # first paint is bounded by widget construction alone.
+        self.api_key_loaded.connect(self._on_api_key_loaded)
+        Thread(target=self._startup_io, daemon=True).start()
+
+    def _startup_io(self):
+        self.api_key_loaded.emit(read_api_key() or "")
+        # Warm up the TLS connection while the user is still typing so the
+        # first chunk request doesn't pay the handshake.
+        prewarm_connection()
+
+    @pyqtSlot(str)
+    def _on_api_key_loaded(self, api_key):
+        self.api_key = api_key or None
         self.check_api_key()
-        self.set_dark_theme()  # Set dark theme by default
 
     def initUI(self):
         self.setWindowTitle("OpenAI TTS")
         self.setGeometry(100, 100, 600, 400)
 
         self.text_edit = QTextEdit(self)
-        self.text_edit.setStyleSheet("QTextEdit { background-color: #F5F5F5; }")
         self.char_count_label = QLabel("Character Count: 0", self)
         self.chunk_count_label = QLabel("Number of Chunks: 0", self)
         self.price_label = QLabel("Estimated Price: $0.015", self)
@@ -50,6 +175,16 @@ class TTSWindow(QWidget):
 
         self.speed_input = QLineEdit(self)
         self.speed_input.setText("1.0")
+        # The API accepts 0.25-4.0; the validator rejects bad keystrokes at
+        # the widget, so submit can ask it for the verdict instead of
+        # round-tripping through float() and exception handling.
+        self._speed_validator = QDoubleValidator(0.25, 4.0, 2, self)
+        self._speed_validator.setNotation(QDoubleValidator.Notation.StandardNotation)
+        # Pin to the C locale so the validator accepts exactly what float()
+        # parses; the system locale would accept "1,0" and reject "1.0" on
+        # comma-decimal systems.
+        self._speed_validator.setLocale(QLocale.c())
+        self.speed_input.setValidator(self._speed_validator)
 
         self.format_combo = QComboBox(self)
         self.format_combo.addItems(["mp3", "opus", "aac", "flac"])
@@ -58,6 +193,7 @@ class TTSWindow(QWidget):
         self.select_path_button = QPushButton("Select Path", self)
 
         self.progress_bar = QProgressBar(self)
+        self.status_label = QLabel("", self)
 
         self.create_button = QPushButton("Create TTS", self)
 
@@ -90,6 +226,7 @@ class TTSWindow(QWidget):
         self.layout.addLayout(path_layout)
 
         self.layout.addWidget(self.progress_bar)
+        self.layout.addWidget(self.status_label)
 
         button_layout = QHBoxLayout()
         button_layout.addWidget(self.create_button)
@@ -107,16 +244,26 @@ class TTSWindow(QWidget):
         theme_menu = QMenu("Themes", self)
         settings_menu.addMenu(theme_menu)
 
-        light_action = QAction("Light", self)
-        dark_action = QAction("Dark", self)
-        theme_menu.addAction(light_action)
-        theme_menu.addAction(dark_action)
+        # Declarative table: each action carries its stylesheet in data(),
+        # so one shared slot serves every theme without per-action lambdas.
+        for name, stylesheet in (
+            ("Light", config.LIGHT_STYLESHEET),
+            ("Dark", config.DARK_STYLESHEET),
+        ):
+            theme_action = QAction(name, self)
+            theme_action.setData(stylesheet)
+            theme_action.triggered.connect(self._on_theme_action)
+            theme_menu.addAction(theme_action)
 
         self.retain_files_checkbox_action = QAction(
             "Retain individual audio files", self, checkable=True
         )
         settings_menu.addAction(self.retain_files_checkbox_action)
 
+        presets_action = QAction("Presets...", self)
+        settings_menu.addAction(presets_action)
+        presets_action.triggered.connect(self.open_preset_dialog)
+
         api_key_menu = QMenu("API Key", self)
         settings_menu.addMenu(api_key_menu)
 
@@ -125,30 +272,55 @@ class TTSWindow(QWidget):
         api_key_menu.addAction(use_system_action)
         api_key_menu.addAction(set_custom_action)
 
-        light_action.triggered.connect(self.set_light_theme)
-        dark_action.triggered.connect(self.set_dark_theme)
         use_system_action.triggered.connect(self.use_system_api_key)
         set_custom_action.triggered.connect(self.set_custom_api_key)
 
+        # Splitting the whole text on every keystroke stalls the GUI on long
+        # inputs, so the chunk recount is debounced; the cheap labels update
+        # immediately.
+        self._count_timer = QTimer(self)
+        self._count_timer.setSingleShot(True)
+        self._count_timer.setInterval(self.COUNT_DEBOUNCE_MS)
+        self._count_timer.timeout.connect(self.update_chunk_count)
+
+        # Queued progress emissions can outpace useful repaints; latch the
+        # newest value and apply it at most once per ~frame (30 Hz).
+        self._pending_progress = 0
+        self._progress_timer = QTimer(self)
+        self._progress_timer.setSingleShot(True)
+        self._progress_timer.setInterval(33)
+        self._progress_timer.timeout.connect(self._flush_progress)
+
         self.text_edit.textChanged.connect(self.update_counts)
+        self.format_combo.currentTextChanged.connect(self._on_format_changed)
+        # Prime the per-format caches for the initial selection.
+        self._on_format_changed(self.format_combo.currentText())
         self.select_path_button.clicked.connect(self.select_path)
         self.create_button.clicked.connect(self.create_tts)
         self.progress_updated.connect(self.update_progress)
-
-    def set_light_theme(self):
-        self.setStyleSheet("QWidget { background-color: #FFFFFF; color: #000000; }")
-        self.text_edit.setStyleSheet(
-            "QTextEdit { background-color: #F0F0F0; color: #000000; }"
+        self.status_updated.connect(self.update_status)
+        self.ui_enabled.connect(self._set_ui_enabled)
+
+        # Everything a running job must lock out, gathered once so the
+        # toggle is a single loop instead of a pile of attribute lookups.
+        self._toggle_widgets = (
+            self.text_edit,
+            self.model_combo,
+            self.voice_combo,
+            self.speed_input,
+            self.format_combo,
+            self.path_entry,
+            self.select_path_button,
+            self.create_button,
+            menubar,
         )
 
-    def set_dark_theme(self):
-        self.setStyleSheet("QWidget { background-color: #2E2E2E; color: #FFFFFF; }")
-        self.text_edit.setStyleSheet(
-            "QTextEdit { background-color: #3E3E3E; color: #FFFFFF; }"
-        )
+    @pyqtSlot()
+    def _on_theme_action(self):
+        self.setStyleSheet(self.sender().data())
 
     def use_system_api_key(self):
-        self.api_key = read_api_key()
+        self.api_key = read_api_key(refresh=True)
         QMessageBox.information(self, "API Key", "Using system API key.")
 
     def set_custom_api_key(self):
@@ -160,58 +332,247 @@ class TTSWindow(QWidget):
             save_api_key(api_key)
             QMessageBox.information(self, "API Key", "Custom API key set.")
 
+    @staticmethod
+    def _set_label(label, text):
+        # QLabel.setText re-layouts even for identical text; skip the
+        # repaint when nothing visible changed.
+        if label.text() != text:
+            label.setText(text)
+
+    def _get_text(self):
+        if self._text_dirty:
+            self._text_cache = self.text_edit.toPlainText()
+            self._text_dirty = False
+        return self._text_cache
+
     def update_counts(self):
-        text = self.text_edit.toPlainText()
-        char_count = len(text)
-        chunks = split_text(text)
-        num_chunks = len(chunks)
-        hd = "hd" in self.model_combo.currentText()
+        self._text_dirty = True
+        # characterCount reads the document's own counter (+1 for the final
+        # block separator), so the keystroke path never materializes the
+        # text; only the debounced split does.
+        char_count = self.text_edit.document().characterCount() - 1
+        hd = self.model_combo.currentText() == "tts-1-hd"
         price = estimate_price(char_count, hd)
-        self.char_count_label.setText(f"Character Count: {char_count}")
-        self.chunk_count_label.setText(f"Number of Chunks: {num_chunks}")
-        self.price_label.setText(f"Estimated Price: ${price:.3f}")
+        self._set_label(self.char_count_label, f"Character Count: {char_count}")
+        self._set_label(self.price_label, f"Estimated Price: ${price:.3f}")
+        # ceil(len/4096) is an O(1) stand-in until the debounced precise
+        # split runs; the two only differ when boundaries shift chunks.
+        self._set_label(
+            self.chunk_count_label, f"Number of Chunks: {-(-char_count // 4096)}"
+        )
+        self._count_timer.start()
+
+    def update_chunk_count(self):
+        text = self._get_text().strip()
+        if text and text == self._cached_chunks_text:
+            # Nothing material changed since the last split (e.g. only
+            # surrounding whitespace was edited); reuse it.
+            num_chunks = len(self._cached_chunks)
+        elif text:
+            self._cached_chunks_text = text
+            self._cached_chunks = split_text(text)
+            num_chunks = len(self._cached_chunks)
+        else:
+            self._cached_chunks_text = None
+            self._cached_chunks = None
+            num_chunks = 0
+        self._set_label(self.chunk_count_label, f"Number of Chunks: {num_chunks}")
+
+    def current_settings(self):
+        return {
+            "model": self.model_combo.currentText(),
+            "voice": self.voice_combo.currentText(),
+            "speed": self.speed_input.text(),
+            "format": self.format_combo.currentText(),
+        }
+
+    def _apply_preset(self, settings):
+        # Four programmatic sets would fire four change cascades; block them
+        # and run one recount at the end instead.
+        with (
+            QSignalBlocker(self.model_combo),
+            QSignalBlocker(self.voice_combo),
+            QSignalBlocker(self.speed_input),
+            QSignalBlocker(self.format_combo),
+        ):
+            self.model_combo.setCurrentText(settings.get("model", "tts-1"))
+            self.voice_combo.setCurrentText(settings.get("voice", "alloy"))
+            self.speed_input.setText(settings.get("speed", "1.0"))
+            self.format_combo.setCurrentText(settings.get("format", "mp3"))
+        self.update_counts()
+
+    def open_preset_dialog(self):
+        # Build the dialog once; reopening only refreshes the list (a no-op
+        # read thanks to the mtime cache) instead of re-laying-out widgets.
+        if self._preset_dialog is None:
+            self._preset_dialog = PresetDialog(self)
+            self._preset_dialog.preset_selected.connect(self._apply_preset)
+        else:
+            self._preset_dialog.load_presets()
+        self._preset_dialog.exec()
+
+    @pyqtSlot(str)
+    def _on_format_changed(self, selected_format):
+        # Resolve the filter and extension once per format switch so the
+        # interactive paths below are plain attribute reads.
+        self._cur_filter = config.FORMAT_FILTER_MAP.get(
+            selected_format, "All Files (*.*)"
+        )
+        self._cur_ext = config.FORMAT_EXTENSION_MAP.get(selected_format, ".mp3")
+        # Keep an already-chosen save path in step with the format. Both
+        # early returns matter: no path means no splitext, and a matching
+        # extension means no setText (and no textChanged cascade).
+        current = self.path_entry.text()
+        if not current:
+            return
+        root, ext = os.path.splitext(current)
+        if ext.lower() == self._cur_ext:
+            return
+        self.path_entry.setText(root + self._cur_ext)
 
     def select_path(self):
-        format_map = {
-            "mp3": "MP3 Files (*.mp3)",
-            "opus": "Opus Files (*.opus)",
-            "aac": "AAC Files (*.aac)",
-            "flac": "FLAC Files (*.flac)",
-        }
-        selected_format = self.format_combo.currentText()
-        file_filter = format_map.get(selected_format, "All Files (*.*)")
-        file_path, _ = QFileDialog.getSaveFileName(self, "Save As", "", file_filter)
+        file_path, _ = QFileDialog.getSaveFileName(
+            self, "Save As", "", self._cur_filter
+        )
         if file_path:
+            root, ext = os.path.splitext(file_path)
+            if ext.lower() != self._cur_ext:
+                file_path = root + self._cur_ext
             self.path_entry.setText(file_path)
 
     def create_tts(self):
+        # Belt and braces next to the widget disabling: a click that slips
+        # through before the disable paints must not start a second job
+        # racing the first for the same output path.
+        if self._running:
+            return
         if not self.api_key:
             self.show_message(
-                "No API key found. Set the API key in the environment variable or the app's settings."
+                "No API key found. Set the API key in the environment variable or the app's settings.",
+                level="warning",
+            )
+            return
+        speed_text = self.speed_input.text()
+        state, _, _ = self._speed_validator.validate(speed_text, 0)
+        if state != QValidator.State.Acceptable:
+            self.show_message(
+                "Speed must be a number between 0.25 and 4.0.", level="warning"
             )
             return
+        text = self._get_text()
+        stripped = text.strip()
         values = {
-            "text_box": self.text_edit.toPlainText(),
+            "text_box": text,
             "path_entry": self.path_entry.text(),
             "model_var": self.model_combo.currentText(),
             "voice_var": self.voice_combo.currentText(),
             "format_var": self.format_combo.currentText(),
-            "speed_var": self.speed_input.text(),
+            "speed_var": speed_text,
             "retain_files": self.retain_files_checkbox_action.isChecked(),
+            "chunks": (
+                self._cached_chunks
+                if stripped and stripped == self._cached_chunks_text
+                else None
+            ),
         }
         create_tts(values, self)
 
     @pyqtSlot(int)
     def update_progress(self, value):
-        self.progress_bar.setValue(value)
-
-    def show_message(self, message):
-        msg_box = QMessageBox()
+        self._pending_progress = value
+        if not self._progress_timer.isActive():
+            # First value in a burst paints immediately; the rest wait for
+            # the timer and collapse into one setValue.
+            self._flush_progress()
+            self._progress_timer.start()
+
+    def _flush_progress(self):
+        if self.progress_bar.value() != self._pending_progress:
+            self.progress_bar.setValue(self._pending_progress)
+
+    @pyqtSlot(str)
+    def update_status(self, message):
+        self.status_label.setText(message)
+
+    @pyqtSlot(bool)
+    def _set_ui_enabled(self, enabled):
+        # ui_enabled is emitted exactly at job start and job end, so the
+        # running flag can ride along with the widget toggle.
+        self._running = not enabled
+        # Suspend painting while nine widgets flip so Qt composites one
+        # repaint for the batch instead of one per widget.
+        self.setUpdatesEnabled(False)
+        try:
+            for widget in self._toggle_widgets:
+                widget.setEnabled(enabled)
+        finally:
+            self.setUpdatesEnabled(True)
+        if enabled and self._force_close:
+            # A close was confirmed while the job was still running; the
+            # job has now ended, so finish the deferred shutdown.
+            self.close()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if not self._msgbox_prewarmed:
+            self._msgbox_prewarmed = True
+            QTimer.singleShot(100, self._prewarm_msgbox)
+
+    def _prewarm_msgbox(self):
+        # The first QMessageBox ever constructed loads the platform style
+        # and icon theme, which can take seconds on some setups. Pay that
+        # at idle right after the window shows, not on the first error.
+        box = QMessageBox(self)
+        box.setIcon(QMessageBox.Icon.Information)
+        box.deleteLater()
+
+    def show_message(self, message, level="info"):
+        # open() posts the dialog to the running event loop instead of
+        # spinning a nested one inside exec(); callers return immediately
+        # and queued progress/status updates keep painting. One box is
+        # cached per level so repeated errors skip construction and style
+        # resolution entirely — only the text changes.
+        msg_box = self._msg_cache.get(level)
+        if msg_box is None:
+            msg_box = QMessageBox(self)
+            msg_box.setIcon(_MSG_ICONS.get(level, QMessageBox.Icon.Information))
+            self._msg_cache[level] = msg_box
         msg_box.setText(message)
-        msg_box.exec()
+        msg_box.open()
+
+    def closeEvent(self, event):
+        if self._force_close or not self._running:
+            event.accept()
+            return
+        # A job is still running. open() can't answer synchronously, so
+        # refuse this close and re-enter via the callback if confirmed.
+        event.ignore()
+        msg_box = QMessageBox(self)
+        msg_box.setText("A TTS job is still running. Quit anyway?")
+        msg_box.setStandardButtons(_YES_NO)
+        # Default to the safe answer, and stay window-modal: only this
+        # window is blocked, and the prompt can't hide behind it.
+        msg_box.setDefaultButton(_NO)
+        msg_box.setWindowModality(Qt.WindowModality.WindowModal)
+        msg_box.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+        msg_box.finished.connect(self._on_close_confirmed)
+        msg_box.open()
+
+    def _on_close_confirmed(self, result):
+        if result != _YES:
+            return
+        self._force_close = True
+        if self._running and self.job_cancel_event is not None:
+            # Ask the workers to wind down; the job's terminal ui_enabled
+            # signal completes the close, so no thread is orphaned
+            # mid-write.
+            self.job_cancel_event.set()
+        else:
+            self.close()
 
     def check_api_key(self):
         if not self.api_key:
             self.show_message(
-                "No API key found. Please set the API key in the environment variable 'OPENAI_API_KEY' or in the app's settings."
+                "No API key found. Please set the API key in the environment variable 'OPENAI_API_KEY' or in the app's settings.",
+                level="warning",
             )
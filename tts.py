@@ -1,9 +1,11 @@
 import os
+import random
 import requests
 import time
 import logging
-from threading import Thread
-from decimal import Decimal
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from threading import Event, Thread
+from PyQt6.QtCore import Qt
 from PyQt6.QtWidgets import QMessageBox
 from utils import (
     split_text,
@@ -14,11 +16,13 @@ from utils import (
     rate_limited_request,
 )
 
-# Constants for price and API calls
-TTS_PRICE_PER_1K_CHARS = Decimal("0.015")
-TTS_HD_PRICE_PER_1K_CHARS = Decimal("0.030")
+# Constants for API calls
 MAX_RETRIES = 3
 RETRY_DELAY = 5  # seconds
+MAX_WORKERS = 8  # concurrent chunk requests; rate limiting still applies
+
+# Background fragment-deletion thread from the previous job, if any.
+_pending_cleanup = None
 
 logging.basicConfig(
     filename="tts_app.log",
@@ -30,39 +34,53 @@ logging.basicConfig(
 def create_tts(values, window):
     text = values["text_box"].strip()
     path = values["path_entry"]
-    if not path or not os.path.isdir(os.path.dirname(path)):
-        window.show_message("Invalid path")
+    if not path:
+        window.show_message("Invalid path", level="warning")
         return
     api_key = read_api_key()
     if not api_key:
         window.show_message(
-            "No API key found. Set the API key in the environment variable or the app's settings."
+            "No API key found. Set the API key in the environment variable or the app's settings.",
+            level="warning",
         )
         return
     model = values["model_var"]
     voice = values["voice_var"]
     response_format = values["format_var"]
     speed = float(values["speed_var"]) if values["speed_var"] else 1.0
-    hd = "hd" in model
+    hd = model == "tts-1-hd"
     char_count = len(text)
     estimated_price = estimate_price(char_count, hd)
     retain_files = values["retain_files"]
 
-    msg_box = QMessageBox()
+    msg_box = QMessageBox(window)
     msg_box.setText(
         f"The estimated cost for this TTS is ${estimated_price:.3f}. Do you want to continue?"
     )
     msg_box.setStandardButtons(
         QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
     )
-    result = msg_box.exec()
+    # Parented boxes outlive dismissal unless told otherwise; without this
+    # every Create click would leak one dialog for the session.
+    msg_box.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
 
-    if result == QMessageBox.StandardButton.Yes:
+    def _on_price_reply(result):
+        if result != QMessageBox.StandardButton.Yes:
+            return
+        # Reuse the split the GUI's debounced recount already computed, if
+        # the text hasn't changed since.
+        chunks = values.get("chunks") or split_text(text)
+        # Owned by the job but exposed on the window so shutdown can ask
+        # the workers to stop instead of orphaning them.
+        cancel_event = Event()
+        window.job_cancel_event = cancel_event
+        window.ui_enabled.emit(False)
         window.progress_updated.emit(1)  # Set progress to 1% when starting
+        window.status_updated.emit("Generating speech...")
         Thread(
             target=process_speech,
             args=(
-                split_text(text),
+                chunks,
                 path,
                 api_key,
                 model,
@@ -71,35 +89,181 @@ def create_tts(values, window):
                 speed,
                 retain_files,
                 window,
+                cancel_event,
             ),
         ).start()
 
+    # open() shows the dialog without exec()'s nested event loop, so queued
+    # progress/status updates keep painting while it is up.
+    msg_box.finished.connect(_on_price_reply)
+    msg_box.open()
+
 
 def process_speech(
-    chunks, path, api_key, model, voice, response_format, speed, retain_files, window
+    chunks,
+    path,
+    api_key,
+    model,
+    voice,
+    response_format,
+    speed,
+    retain_files,
+    window,
+    cancel_event,
 ):
-    temp_files = []
-    total_chunks = len(chunks)
-    for i, chunk in enumerate(chunks):
-        progress = (i / total_chunks) * 100
-        window.progress_updated.emit(progress)
-        temp_filename = os.path.join(
-            os.path.dirname(path),
-            f"{os.path.splitext(os.path.basename(path))[0]}_{i}.{response_format}",
+    try:
+        _run_speech_job(
+            chunks,
+            path,
+            api_key,
+            model,
+            voice,
+            response_format,
+            speed,
+            retain_files,
+            window,
+            cancel_event,
         )
-        temp_files.append(temp_filename)
-        if not save_chunk(
-            chunk, temp_filename, api_key, model, voice, response_format, speed
+    except Exception as e:
+        # A bug or a non-network I/O error (disk full, read-only directory)
+        # must surface as a failed job, never as a silently dead thread.
+        logging.exception("Unexpected error in TTS job: %s", e)
+        window.status_updated.emit("TTS failed - see tts_app.log for details.")
+    finally:
+        # Whatever happened above, the widgets must come back; a crash here
+        # otherwise leaves the whole window permanently disabled.
+        window.ui_enabled.emit(True)
+
+
+def _run_speech_job(
+    chunks,
+    path,
+    api_key,
+    model,
+    voice,
+    response_format,
+    speed,
+    retain_files,
+    window,
+    cancel_event,
+):
+    out_dir = os.path.dirname(path) or "."
+    try:
+        # Probing/creating the directory can stall for seconds on network
+        # mounts, so it happens here on the worker thread, never in the
+        # click handler.
+        os.makedirs(out_dir, exist_ok=True)
+    except OSError as e:
+        logging.error("Invalid save path %s: %s", path, e)
+        window.status_updated.emit("Invalid save path - see tts_app.log for details.")
+        return
+    total_chunks = len(chunks)
+    if total_chunks == 1:
+        # The common interactive case: no pool, no fragment file, no ffmpeg.
+        if save_chunk(
+            chunks[0], path, api_key, model, voice, response_format, speed, cancel_event
         ):
-            cleanup_files(temp_files, retain_files)
-            return
-    concatenate_audio_files(temp_files, path)
+            window.progress_updated.emit(100)
+            window.status_updated.emit(f"Saved to {path}")
+        else:
+            window.status_updated.emit("TTS failed - see tts_app.log for details.")
+        return
+    global _pending_cleanup
+    if _pending_cleanup is not None and _pending_cleanup.is_alive():
+        # Fragment names are deterministic, so a previous job's deferred
+        # cleanup must finish before this job starts writing files with
+        # the same names next to the same output path.
+        _pending_cleanup.join()
+    base_name = os.path.splitext(os.path.basename(path))[0]
+    # Zero-padded indices keep filesystem sort order aligned with chunk
+    # order, which matters when fragments are retained for inspection.
+    temp_files = [
+        os.path.join(out_dir, f"{base_name}_{i:04d}.{response_format}")
+        for i in range(total_chunks)
+    ]
+    completed = 0
+    failed = False
+    last_emit = 0.0
+    # cancel() only stops futures that haven't started; the shared event
+    # lets already-running workers abandon their retries within seconds.
+    with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, total_chunks)) as executor:
+        futures = {
+            executor.submit(
+                save_chunk,
+                chunk,
+                temp_files[i],
+                api_key,
+                model,
+                voice,
+                response_format,
+                speed,
+                cancel_event,
+            ): i
+            for i, chunk in enumerate(chunks)
+        }
+        for future in as_completed(futures):
+            if not future.result():
+                failed = True
+                cancel_event.set()
+                for pending in futures:
+                    pending.cancel()
+                break
+            completed += 1
+            # Coalesce to ~20 Hz so hundreds of near-simultaneous chunk
+            # completions don't each wake the GUI thread for a repaint.
+            now = time.monotonic()
+            if completed == total_chunks or now - last_emit > 0.05:
+                last_emit = now
+                window.progress_updated.emit(int(completed / total_chunks * 99))
+    if failed:
+        window.status_updated.emit("TTS failed - see tts_app.log for details.")
+        # The pool has shut down by here, so no worker is still writing the
+        # temp files we are about to delete.
+        cleanup_files(temp_files, retain_files)
+        return
+    if not concatenate_audio_files(temp_files, path):
+        # Keep the fragments: the audio is already paid for and downloaded,
+        # and the log explains what went wrong with the join.
+        window.status_updated.emit("TTS failed - see tts_app.log for details.")
+        return
     window.progress_updated.emit(100)
+    window.status_updated.emit(f"Saved to {path}")
     if not retain_files:
-        cleanup_files(temp_files, retain_files)
+        # Deleting hundreds of fragments can take seconds on slow disks;
+        # do it off this thread so 100% really means done for the user.
+        cleanup_thread = Thread(
+            target=cleanup_files, args=(temp_files, retain_files), daemon=True
+        )
+        cleanup_thread.start()
+        _pending_cleanup = cleanup_thread
+
+
+def _retry_delay(attempt, response=None):
+    """Backoff before retry `attempt`, honoring the server's Retry-After."""
+    if response is not None:
+        retry_after = response.headers.get("Retry-After")
+        if retry_after:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+    # Full jitter (AWS style): sleep anywhere in [0, backoff] so concurrent
+    # workers spread out instead of retrying in lockstep after a shared 429.
+    return random.uniform(0, min(60, RETRY_DELAY * (2**attempt)))
 
 
-def save_chunk(text, filename, api_key, model, voice, response_format, speed):
+def _backoff_sleep(delay, cancel_event):
+    # Waiting on the event doubles as the sleep and wakes instantly if the
+    # job is cancelled mid-backoff.
+    if cancel_event is not None:
+        cancel_event.wait(delay)
+    else:
+        time.sleep(delay)
+
+
+def save_chunk(
+    text, filename, api_key, model, voice, response_format, speed, cancel_event=None
+):
     data = {
         "model": model,
         "input": text,
@@ -108,27 +272,50 @@ def save_chunk(text, filename, api_key, model, voice, response_format, speed):
         "speed": speed,
     }
     for attempt in range(MAX_RETRIES):
+        if cancel_event is not None and cancel_event.is_set():
+            return False
         try:
             response = rate_limited_request(api_key, data, model)
-            if response.status_code == 200:
-                if len(response.content) == 0:
-                    logging.error(f"Received empty audio content for chunk {filename}.")
+            # The context manager hands the streamed connection back to the
+            # pool on every exit path; the backoff sleep happens after that
+            # so a waiting worker isn't pinning a pooled connection.
+            with response:
+                if response.status_code == 200:
+                    # Write the audio while it downloads instead of buffering
+                    # the whole blob in memory first.
+                    bytes_written = 0
+                    with open(filename, "wb") as file:
+                        for block in response.iter_content(chunk_size=65536):
+                            file.write(block)
+                            bytes_written += len(block)
+                    if bytes_written == 0:
+                        logging.error(
+                            "Received empty audio content for chunk %s.", filename
+                        )
+                        os.remove(filename)
+                        return False
+                    logging.info("Saved chunk to %s", filename)
+                    return True
+                elif response.status_code in [429, 500, 502, 503, 504]:
+                    logging.warning(
+                        "Received status code %s. Retrying after delay.",
+                        response.status_code,
+                    )
+                    delay = _retry_delay(attempt, response)
+                else:
+                    logging.error(
+                        "Failed to create TTS for chunk %s: %s\n%s",
+                        filename,
+                        response.status_code,
+                        response.text,
+                    )
                     return False
-                with open(filename, "wb") as file:
-                    file.write(response.content)
-                logging.info(f"Saved chunk to {filename}")
-                return True
-            elif response.status_code in [429, 500, 502, 503, 504]:
-                logging.warning(
-                    f"Received status code {response.status_code}. Retrying after delay."
-                )
-                time.sleep(RETRY_DELAY * (attempt + 1))
-            else:
-                logging.error(
-                    f"Failed to create TTS for chunk {filename}: {response.status_code}\n{response.text}"
-                )
-                return False
-        except requests.RequestException as e:
-            logging.exception(f"Network error occurred on attempt {attempt + 1}: {e}")
-            time.sleep(RETRY_DELAY * (attempt + 1))
+            _backoff_sleep(delay, cancel_event)
+        except (
+            requests.ConnectionError,
+            requests.Timeout,
+            requests.exceptions.ChunkedEncodingError,
+        ) as e:
+            logging.exception("Network error occurred on attempt %s: %s", attempt + 1, e)
+            _backoff_sleep(_retry_delay(attempt), cancel_event)
     return False
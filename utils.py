@@ -1,13 +1,26 @@
+import json
 import os
+import re
 import subprocess
+from bisect import bisect_right
 import requests
 import time
 import logging
+
+try:
+    import orjson
+except ImportError:  # optional; the stdlib encoder works, just slower
+    orjson = None
 from decimal import Decimal
+from functools import lru_cache
+from pathlib import Path
+from threading import Lock
 
 # Constants for price and API calls
-TTS_PRICE_PER_1K_CHARS = Decimal("0.015")
-TTS_HD_PRICE_PER_1K_CHARS = Decimal("0.030")
+# Price per 4096-char block, in thousandths of a dollar; integer math keeps
+# Decimal off the per-keystroke estimate path.
+TTS_PRICE_THOUSANDTHS = 15
+TTS_HD_PRICE_THOUSANDTHS = 30
 MAX_RETRIES = 3
 RETRY_DELAY = 5  # seconds
 
@@ -18,143 +31,285 @@ logging.basicConfig(
 )
 
 
+# Sentence terminators that make good chunk boundaries.
+_SENTENCE_END_RE = re.compile(r"[.?!;]")
+_SPACE_RE = re.compile(" ")
+
+
 def split_text(text, chunk_size=4096):
     if len(text) <= chunk_size:
         return [text]
+    # One C-speed scan collects every sentence boundary up front; each chunk
+    # then picks its break by bisection instead of re-scanning its window.
+    sentence_ends = [m.end() for m in _SENTENCE_END_RE.finditer(text)]
+    # The space fallback list is only built if some window has no sentence
+    # terminator at all.
+    spaces = None
     chunks = []
-    while text:
-        if len(text) <= chunk_size:
-            chunks.append(text)
+    start = 0
+    total = len(text)
+    while start < total:
+        if total - start <= chunk_size:
+            chunks.append(text[start:])
             break
-        split_index = -1
-        for punct in [".", "?", "!", ";"]:
-            last_punct_index = text[:chunk_size].rfind(punct)
-            if last_punct_index != -1:
-                split_index = max(split_index, last_punct_index + 1)
-                break
-        if split_index == -1:
-            split_index = text[:chunk_size].rfind(" ")
-        if split_index == -1:
-            split_index = chunk_size
-        chunks.append(text[:split_index])
-        text = text[split_index:].lstrip()
+        limit = start + chunk_size
+        idx = bisect_right(sentence_ends, limit)
+        if idx and sentence_ends[idx - 1] > start:
+            split_index = sentence_ends[idx - 1]
+        else:
+            if spaces is None:
+                spaces = [m.start() for m in _SPACE_RE.finditer(text)]
+            idx = bisect_right(spaces, limit - 1)
+            split_index = spaces[idx - 1] if idx else -1
+        if split_index <= start:
+            split_index = limit
+        chunks.append(text[start:split_index])
+        # Skip the whitespace the old tail-lstrip used to drop.
+        while split_index < total and text[split_index].isspace():
+            split_index += 1
+        start = split_index
     return chunks
 
 
+@lru_cache(maxsize=128)
 def estimate_price(char_count, hd=False):
     if char_count == 0:
-        return 0.000
-    token_price = TTS_PRICE_PER_1K_CHARS if not hd else TTS_HD_PRICE_PER_1K_CHARS
+        return Decimal("0.000")
+    per_block = TTS_HD_PRICE_THOUSANDTHS if hd else TTS_PRICE_THOUSANDTHS
     char_blocks = (char_count + 4095) // 4096  # Correct chunk size
-    total_price = char_blocks * token_price
-    return round(total_price, 3)
+    # Decimal only at the boundary, for exact display formatting.
+    return Decimal(char_blocks * per_block) / 1000
+
+
+_api_key = None
 
 
-def read_api_key():
+def read_api_key(refresh=False):
+    global _api_key
+    if _api_key and not refresh:
+        return _api_key
     api_key = os.getenv("OPENAI_API_KEY")
-    if api_key:
-        return api_key
-    try:
-        with open("api_key.txt", "r") as file:
-            return file.read().strip()
-    except FileNotFoundError:
-        return None
+    if not api_key:
+        try:
+            with open("api_key.txt", "r") as file:
+                api_key = file.read().strip()
+        except FileNotFoundError:
+            # Drop any stale cached key: a refresh that finds nothing must
+            # not let later plain calls resurrect the old value.
+            _api_key = None
+            return None
+    _api_key = api_key
+    return _api_key
 
 
 def save_api_key(api_key):
+    global _api_key
     with open("api_key.txt", "w") as file:
         file.write(api_key)
+    _api_key = api_key
+
+
+PRESETS_FILE = "presets.json"
+
+# mtime-keyed memo: reopening the preset dialog skips the read + JSON parse
+# entirely while the file on disk is unchanged.
+_presets_cache = {"mtime": None, "data": {}}
+
+
+def load_presets(path=PRESETS_FILE):
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        _presets_cache["mtime"] = None
+        _presets_cache["data"] = {}
+        return {}
+    if mtime != _presets_cache["mtime"]:
+        try:
+            with open(path, "r") as file:
+                _presets_cache["data"] = json.load(file)
+        except (OSError, ValueError) as e:
+            logging.error("Failed to load presets: %s", e)
+            _presets_cache["data"] = {}
+        _presets_cache["mtime"] = mtime
+    # Callers get a shallow copy so edits don't corrupt the cache.
+    return dict(_presets_cache["data"])
+
+
+def save_presets(presets, path=PRESETS_FILE):
+    # Write-then-replace is atomic, so a crash mid-save can't truncate the
+    # presets file.
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as file:
+        json.dump(presets, file, indent=2)
+    os.replace(tmp_path, path)
+    # Refresh the memo from what was just written instead of invalidating
+    # it, so the reload after a save skips the disk round-trip too.
+    _presets_cache["data"] = dict(presets)
+    try:
+        _presets_cache["mtime"] = os.stat(path).st_mtime_ns
+    except OSError:
+        _presets_cache["mtime"] = None
 
 
 def concatenate_audio_files(file_list, output_file):
+    """Join the chunk files into output_file; True on success."""
     if len(file_list) == 1:
         os.rename(file_list[0], output_file)
-        logging.info(f"Renamed single chunk to {output_file}")
-        return
+        logging.info("Renamed single chunk to %s", output_file)
+        return True
 
     try:
+        # A bare filename has no directory component; makedirs("") raises.
         output_dir = os.path.dirname(output_file)
-        if not os.path.exists(output_dir):
+        if output_dir and not os.path.exists(output_dir):
             os.makedirs(output_dir)
-        concat_list_path = os.path.join(output_dir, "concat_list.txt")
-
-        with open(concat_list_path, "w") as f:
-            for file_path in file_list:
-                if os.path.exists(file_path):
-                    f.write(f"file '{file_path}'\n")
-                else:
-                    logging.error(
-                        f"File {file_path} does not exist and will not be concatenated."
-                    )
-
-        output_extension = os.path.splitext(output_file)[1].lower()
-        if output_extension == ".mp3":
-            codec = "libmp3lame"
-        elif output_extension == ".flac":
-            codec = "flac"
-        elif output_extension == ".aac":
-            codec = "aac"
-        elif output_extension == ".opus":
-            codec = "libopus"
-        else:
-            codec = "copy"
 
+        concat_entries = []
+        for file_path in file_list:
+            if os.path.exists(file_path):
+                # Absolute paths: with the manifest on stdin there is no list
+                # file for ffmpeg to resolve relative entries against.
+                concat_entries.append(f"file '{os.path.abspath(file_path)}'\n")
+            else:
+                logging.error(
+                    "File %s does not exist and will not be concatenated.", file_path
+                )
+        concat_list = "".join(concat_entries)
+
+        # The chunks come back from the API already in the requested format,
+        # so the streams are copied as-is; re-encoding would burn CPU and
+        # degrade quality for nothing.
+        # The file list is piped straight into ffmpeg's concat demuxer so no
+        # concat_list.txt ever touches disk.
         concat_command = [
             "ffmpeg",
             "-f",
             "concat",
             "-safe",
             "0",
+            "-protocol_whitelist",
+            "pipe,file",
             "-i",
-            concat_list_path,
-            "-c:a",
-            codec,
+            "pipe:0",
+            "-c",
+            "copy",
             output_file,
         ]
 
-        logging.info(f"Running ffmpeg command: {' '.join(concat_command)}")
+        logging.info("Running ffmpeg command: %s", " ".join(concat_command))
         result = subprocess.run(
-            concat_command, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+            concat_command,
+            input=concat_list.encode(),
+            check=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
         )
         logging.info(result.stdout.decode())
         logging.error(result.stderr.decode())
-        os.remove(concat_list_path)
-        logging.info(f"Concatenated audio files into {output_file}")
+        logging.info("Concatenated audio files into %s", output_file)
+        return True
     except Exception as e:
-        logging.error(f"Error in concatenating audio files: {e}")
+        logging.error("Error in concatenating audio files: %s", e)
+        return False
+
+
+# One session for all chunk requests: keep-alive avoids a fresh TCP+TLS
+# handshake per chunk, and the adapter pool matches the worker count. Built
+# lazily so importing this module (and thus GUI startup) stays cheap.
+_session = None
+
+
+def _get_session():
+    global _session
+    if _session is None:
+        session = requests.Session()
+        session.headers.update({"Content-Type": "application/json"})
+        session.mount(
+            "https://",
+            requests.adapters.HTTPAdapter(pool_connections=16, pool_maxsize=16),
+        )
+        _session = session
+    return _session
+
+
+class TokenBucket:
+    """Keeps each model under its requests/min cap while allowing bursts.
+
+    Up to `capacity` requests may start back-to-back; after that, starts are
+    paced by the refill rate. The earlier fixed-interval limiter spaced even
+    the first few workers apart, wasting the pool's concurrency.
+    """
+
+    def __init__(self, capacity, refill_per_sec):
+        self.capacity = capacity
+        self.refill_per_sec = refill_per_sec
+        self.tokens = float(capacity)
+        self.last_refill = time.monotonic()
+        self.lock = Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.capacity,
+                    self.tokens + (now - self.last_refill) * self.refill_per_sec,
+                )
+                self.last_refill = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.refill_per_sec
+            # Sleep outside the lock so waiting workers don't serialize.
+            time.sleep(wait)
+
+
+# OpenAI's documented Speech API limits: 50 rpm for tts-1, 3 rpm for tts-1-hd.
+_RATE_LIMITERS = {
+    "tts-1": TokenBucket(5, 50 / 60),
+    "tts-1-hd": TokenBucket(1, 3 / 60),
+}
+
+
+def prewarm_connection():
+    """Open the TLS connection to the API ahead of the first real request.
+
+    Meant to run on a background thread at startup so the handshake hides
+    behind user think-time; failures are irrelevant here and are retried
+    properly by the actual job.
+    """
+    try:
+        _get_session().head("https://api.openai.com", timeout=5)
+    except requests.RequestException:
+        pass
 
 
 def rate_limited_request(api_key, data, model):
-    last_request_time = 0
-    min_interval = 60 / 50
-    if "hd" in model:
-        min_interval = 60 / 3
-
-    elapsed = time.time() - last_request_time
-    if elapsed < min_interval:
-        time.sleep(min_interval - elapsed)
-    response = requests.post(
+    # Exact key lookup; a substring 'hd' test would misclassify any future
+    # model that merely contains those letters.
+    _RATE_LIMITERS.get(model, _RATE_LIMITERS["tts-1"]).acquire()
+    # orjson encodes the unicode-heavy TTS payloads several times faster
+    # than the stdlib; the session already carries the JSON content type.
+    if orjson is not None:
+        body = orjson.dumps(data)
+    else:
+        body = json.dumps(data).encode()
+    return _get_session().post(
         "https://api.openai.com/v1/audio/speech",
-        headers={
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json",
-        },
-        json=data,
+        headers={"Authorization": f"Bearer {api_key}"},
+        data=body,
+        stream=True,
+        timeout=(5, 120),
     )
-    last_request_time = time.time()
-    return response
 
 
 def cleanup_files(file_list, retain_files):
-    if not retain_files:
-        for file in file_list:
-            if os.path.exists(file):
-                try:
-                    os.remove(file)
-                    logging.info(f"Deleted temporary file {file}")
-                except Exception as e:
-                    logging.error(f"Failed to delete temporary file {file}: {e}")
-            else:
-                logging.error(
-                    f"Temporary file {file} does not exist and cannot be deleted."
-                )
+    if retain_files:
+        return
+    for file in file_list:
+        try:
+            # missing_ok spares an exists() probe per path; chunks that were
+            # never written (e.g. after a failed job) just fall through.
+            Path(file).unlink(missing_ok=True)
+        except OSError as e:
+            logging.error("Failed to delete temporary file %s: %s", file, e)